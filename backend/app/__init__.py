@@ -1,9 +1,13 @@
 import os
-from flask import Flask, jsonify, session
+from flask import Flask, jsonify, session, g
 from functools import wraps
 
 from config import config
-from .extensions import db, bcrypt, cors, session as server_session, csrf, migrate
+from .structured_logging import configure_logging
+from .profiling import init_profiling
+from .sqlite import configure_sqlite
+from .extensions import db, bcrypt, cors, session as server_session, csrf, migrate, limiter
+from .user_context import load_current_user
 
 def create_app(config_name=None):
     if config_name is None:
@@ -11,15 +15,20 @@ def create_app(config_name=None):
 
     app = Flask(__name__, static_folder='static', template_folder='templates')
     app.config.from_object(config[config_name])
+    configure_logging(app)
+    init_profiling(app)
 
     # Initialize extensions
     db.init_app(app)
+    configure_sqlite(app, db)
     bcrypt.init_app(app)
     # Load CORS origins from config
-    cors.init_app(app, origins=app.config['CORS_ORIGINS'].split(','), supports_credentials=True)
+    cors.init_app(app, origins=app.config['CORS_ORIGINS'].split(','), supports_credentials=True,
+                  expose_headers=['X-Next-Cursor', 'X-Profile-Id', app.config['REQUEST_ID_HEADER']])
     server_session.init_app(app)
     csrf.init_app(app)
     migrate.init_app(app, db)
+    limiter.init_app(app)
 
     # A simple route to get the CSRF token
     @app.route('/api/csrf-token', methods=['GET'])
@@ -48,6 +57,10 @@ def api_login_required(f):
     def decorated_function(*args, **kwargs):
         if 'user_id' not in session:
             return jsonify({"message": "Authentication required"}), 401
+        # Loads g.current_user (cached) and rejects sessions of deleted users
+        if load_current_user() is None:
+            session.clear()
+            return jsonify({"message": "Authentication required"}), 401
         return f(*args, **kwargs)
     return decorated_function
 
@@ -55,7 +68,8 @@ def admin_required(f):
     @wraps(f)
     @api_login_required
     def decorated_function(*args, **kwargs):
-        if not session.get('is_admin'):
+        # Checked against the user record, not the flag stored in the session at login
+        if not g.current_user.is_admin:
             return jsonify({"message": "Admin access required"}), 403
         return f(*args, **kwargs)
     return decorated_function
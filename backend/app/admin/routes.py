@@ -1,11 +1,20 @@
+import json
 import os
+import time
 import uuid
-from flask import Blueprint, jsonify, request, current_app
+from datetime import datetime, timezone
+from flask import Blueprint, Response, abort, g, jsonify, request, current_app, send_from_directory, stream_with_context
+from sqlalchemy import func, select
 from werkzeug.utils import secure_filename
 
 from ..extensions import db
 from ..models import Product, ProductImage, Order, User
 from .. import admin_required
+from ..jobs import enqueue
+from ..profiling import list_profiles
+from ..order_feed import order_feed
+from ..services.archive_service import ArchiveService
+from ..tasks import delete_product_images
 
 admin_bp = Blueprint('admin_bp', __name__)
 
@@ -13,9 +22,13 @@ def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in current_app.config['ALLOWED_EXTENSIONS']
 
-def save_product_images(files, product_id):
-    """Helper function to save product images."""
-    images_to_add = []
+def save_product_images(files):
+    """
+    Helper function to save product images. Returns the stored filenames.
+    Called before the first database statement of a request, so the uploads
+    are not written to disk while the SQLite write lock is held.
+    """
+    filenames = []
     for file in files:
         if file and file.filename != '' and allowed_file(file.filename):
             extension = os.path.splitext(file.filename)[1].lower()
@@ -25,8 +38,8 @@ def save_product_images(files, product_id):
             save_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
             file.save(save_path)
 
-            images_to_add.append(ProductImage(filename=filename, product_id=product_id))
-    return images_to_add
+            filenames.append(filename)
+    return filenames
 
 @admin_bp.route('/product/new', methods=['POST'])
 @admin_required
@@ -34,37 +47,36 @@ def create_product():
     if 'name' not in request.form or 'price' not in request.form or 'stock' not in request.form:
         return jsonify({"message": "Name, price, and stock are required fields."}), 400
 
+    filenames = save_product_images(request.files.getlist('images'))
+
     new_product = Product(
         name=request.form['name'],
         price=float(request.form['price']),
         stock=int(request.form['stock']),
         description=request.form.get('description', ''),
-        brand=request.form.get('brand', '')
+        brand=request.form.get('brand', ''),
+        images=[ProductImage(filename=filename) for filename in filenames]
     )
     db.session.add(new_product)
-    db.session.flush()
-
-    new_images = save_product_images(request.files.getlist('images'), new_product.id)
-    if new_images:
-        db.session.add_all(new_images)
-
     db.session.commit()
     return jsonify({"message": "Product created successfully!", "productId": new_product.id}), 201
 
 @admin_bp.route('/products/<int:product_id>', methods=['POST'])
 @admin_required
 def update_product(product_id):
-    product_to_update = Product.query.get_or_404(product_id)
+    filenames = save_product_images(request.files.getlist('images'))
+
+    product_to_update = db.session.get(Product, product_id)
+    if product_to_update is None:
+        delete_product_images(filenames)
+        abort(404)
 
     product_to_update.name = request.form.get('name', product_to_update.name)
     product_to_update.price = float(request.form.get('price', product_to_update.price))
     product_to_update.stock = int(request.form.get('stock', product_to_update.stock))
     product_to_update.description = request.form.get('description', product_to_update.description)
     product_to_update.brand = request.form.get('brand', product_to_update.brand)
-
-    new_images = save_product_images(request.files.getlist('images'), product_to_update.id)
-    if new_images:
-        db.session.add_all(new_images)
+    product_to_update.images.extend(ProductImage(filename=filename) for filename in filenames)
 
     db.session.commit()
     return jsonify({"message": f"Product '{product_to_update.name}' updated successfully"}), 200
@@ -74,23 +86,21 @@ def update_product(product_id):
 def delete_product(product_id):
     product_to_delete = Product.query.get_or_404(product_id)
 
-    for image in product_to_delete.images:
-        try:
-            os.remove(os.path.join(current_app.config['UPLOAD_FOLDER'], image.filename))
-        except OSError as e:
-            current_app.logger.error(f"Error deleting image file {image.filename}: {e}")
+    filenames = [image.filename for image in product_to_delete.images]
+    if filenames:
+        enqueue('delete_product_images', filenames=filenames)
 
     db.session.delete(product_to_delete)
     db.session.commit()
     return jsonify({"message": f"Product '{product_to_delete.name}' deleted successfully"}), 200
 
-@admin_bp.route('/orders', methods=['GET'])
-@admin_required
-def get_all_orders():
-    orders = Order.query.order_by(Order.date.desc()).all()
+def serialize_orders(orders):
+    """Builds the admin view of `orders`, loading all their customers in one query."""
+    user_ids = {order.user_id for order in orders}
+    users = {user.id: user for user in User.query.filter(User.id.in_(user_ids))} if user_ids else {}
     orders_list = []
     for order in orders:
-        user = User.query.get(order.user_id)
+        user = users.get(order.user_id)
         order_data = {
             'id': order.id,
             'date': order.date.strftime('%Y-%m-%d %H:%M'),
@@ -112,12 +122,107 @@ def get_all_orders():
             } for item in order.products]
         }
         orders_list.append(order_data)
+    return orders_list
+
+def parse_since(value):
+    """Parses a `since` cursor: an order id, or an ISO timestamp. Returns (since_id, since_date)."""
+    if value is None:
+        return None, None
+    if value.isdigit():
+        return int(value), None
+    since_date = datetime.fromisoformat(value)
+    if since_date.tzinfo is not None:
+        # Order.date is stored as naive UTC
+        since_date = since_date.astimezone(timezone.utc).replace(tzinfo=None)
+    return None, since_date
 
-    return jsonify(orders_list), 200
+@admin_bp.route('/orders', methods=['GET'])
+@admin_required
+def get_all_orders():
+    limit = max(1, min(request.args.get('limit', current_app.config['ORDERS_PAGE_SIZE'], type=int),
+                       current_app.config['ORDERS_MAX_PAGE_SIZE']))
+
+    if 'since' in request.args:
+        # Incremental polling: only orders newer than the cursor, oldest first
+        try:
+            since_id, since_date = parse_since(request.args['since'])
+        except ValueError:
+            return jsonify({"message": "since must be an order id or an ISO timestamp"}), 400
+        orders = ArchiveService.fetch_new_orders(limit, since_id=since_id, since_date=since_date)
+        response = jsonify(serialize_orders(orders))
+        if len(orders) == limit:
+            response.headers['X-Next-Cursor'] = str(orders[-1].id)
+        return response, 200
+
+    before = request.args.get('before', type=int)
+    orders, next_cursor = ArchiveService.fetch_orders(limit, before=before)
+
+    response = jsonify(serialize_orders(orders))
+    if next_cursor is not None:
+        response.headers['X-Next-Cursor'] = str(next_cursor)
+    return response, 200
+
+@admin_bp.route('/orders/stream', methods=['GET'])
+@admin_required
+def stream_orders():
+    """
+    Server-sent events feed of new orders. Each event carries one order and its
+    id, so a reconnecting EventSource resumes from Last-Event-ID. The stream
+    ends after ORDER_FEED_MAX_STREAM_SECONDS to free the worker; browsers
+    reconnect on their own. Disabled unless ORDER_FEED_SSE_ENABLED, since each
+    open stream pins a worker thread.
+    """
+    if not current_app.config['ORDER_FEED_SSE_ENABLED']:
+        return jsonify({"message": "The order stream is disabled, poll /api/admin/orders?since= instead"}), 404
+
+    since_id = request.headers.get('Last-Event-ID', type=int)
+    if since_id is None:
+        since_id = request.args.get('since', type=int)
+    if since_id is None:
+        since_id = db.session.scalar(select(func.max(Order.id))) or 0
+    db.session.close()
+
+    poll_interval = current_app.config['ORDER_FEED_POLL_INTERVAL']
+    max_seconds = current_app.config['ORDER_FEED_MAX_STREAM_SECONDS']
+    page_size = current_app.config['ORDERS_MAX_PAGE_SIZE']
+
+    @stream_with_context
+    def generate():
+        last_id = since_id
+        seen_version = order_feed.version
+        deadline = time.monotonic() + max_seconds
+        yield f"retry: {int(poll_interval * 1000)}\n\n"
+        while time.monotonic() < deadline:
+            orders = ArchiveService.fetch_new_orders(page_size, since_id=last_id)
+            if orders:
+                for order_data in serialize_orders(orders):
+                    yield f"id: {order_data['id']}\nevent: order\ndata: {json.dumps(order_data)}\n\n"
+                last_id = orders[-1].id
+            else:
+                yield ": keep-alive\n\n"
+            # Don't keep a read transaction open while idle
+            db.session.close()
+            if len(orders) < page_size:
+                seen_version = order_feed.wait(seen_version, min(poll_interval, max(0, deadline - time.monotonic())))
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@admin_bp.route('/profiles', methods=['GET'])
+@admin_required
+def get_profiles():
+    if not current_app.config['PROFILING_ENABLED']:
+        return jsonify([]), 200
+    return jsonify(list_profiles()), 200
+
+@admin_bp.route('/profiles/<path:name>', methods=['GET'])
+@admin_required
+def download_profile(name):
+    if secure_filename(name) != name or not name.endswith('.prof'):
+        return jsonify({"message": "Invalid profile name"}), 400
+    return send_from_directory(current_app.config['PROFILE_DIR'], name, as_attachment=True)
 
 @admin_bp.route('/test', methods=['POST'])
 @admin_required
 def admin_test():
-    user_id = session.get('user_id')
-    user = User.query.get(user_id)
-    return jsonify({"message": f"Hello, admin {user.username}! Your test was successful."}), 200
+    return jsonify({"message": f"Hello, admin {g.current_user.username}! Your test was successful."}), 200
@@ -1,13 +1,62 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request, current_app
+from sqlalchemy.orm import selectinload
+
+from ..extensions import csrf
 from ..models import Product
 
 api_bp = Blueprint('api_bp', __name__)
 
+def products_by_ids(ids):
+    """
+    Loads the requested products (and their images) with one query each and
+    returns their dicts in request order, along with the ids that do not exist.
+    """
+    ids = list(dict.fromkeys(ids))  # drop repeats, keep order
+    products = Product.query.options(selectinload(Product.images)).filter(Product.id.in_(ids)).all()
+    found = {product.id: product for product in products}
+    return {
+        'products': [found[product_id].to_dict() for product_id in ids if product_id in found],
+        'missing': [product_id for product_id in ids if product_id not in found]
+    }
+
+def parse_ids(raw_ids, from_query_string=False):
+    """
+    Returns a list of ints, or None if there are too many ids or any is not a
+    real integer: JSON ints, or digit strings when parsing the query string.
+    """
+    ids = []
+    for product_id in raw_ids:
+        if from_query_string and isinstance(product_id, str) and product_id.isdigit():
+            ids.append(int(product_id))
+        elif isinstance(product_id, int) and not isinstance(product_id, bool):
+            ids.append(product_id)
+        else:
+            return None
+    if len(ids) > current_app.config['PRODUCTS_BATCH_MAX_IDS']:
+        return None
+    return ids
+
 @api_bp.route('/products', methods=['GET'])
 def get_products():
-    products = Product.query.all()
+    if 'ids' in request.args:
+        ids = parse_ids(filter(None, request.args['ids'].split(',')), from_query_string=True)
+        if ids is None:
+            return jsonify({"message": f"ids must be a comma-separated list of at most {current_app.config['PRODUCTS_BATCH_MAX_IDS']} product ids"}), 400
+        return jsonify(products_by_ids(ids))
+
+    products = Product.query.options(selectinload(Product.images)).all()
     return jsonify([product.to_dict() for product in products])
 
+# Read-only lookup; POST is only used so large carts are not limited by URL length
+@api_bp.route('/products/batch', methods=['POST'])
+@csrf.exempt
+def get_products_batch():
+    data = request.get_json(silent=True) or {}
+    ids = parse_ids(data.get('ids')) if isinstance(data.get('ids'), list) else None
+    if ids is None:
+        return jsonify({"message": f"ids must be a list of at most {current_app.config['PRODUCTS_BATCH_MAX_IDS']} product ids"}), 400
+    return jsonify(products_by_ids(ids))
+
 @api_bp.route('/products/<int:product_id>', methods=['GET'])
 def get_product(product_id):
     product = Product.query.get_or_404(product_id)
@@ -1,9 +1,11 @@
-from flask import Blueprint, jsonify, request, session
+from flask import Blueprint, jsonify, request, session, g
 from sqlalchemy import or_
 
 from ..extensions import db, bcrypt
-from ..models import User
+from ..models import User, Address
 from .. import api_login_required
+from ..user_context import user_cache
+from ..services.order_service import OrderService, is_valid_address
 
 auth_bp = Blueprint('auth_bp', __name__)
 
@@ -14,11 +16,12 @@ def register():
         return jsonify({"message": "Username, email, and password are required"}), 400
 
     username, email, password = data['username'], data['email'], data['password']
+    # Hash before touching the database so the write transaction stays short
+    hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
 
     if User.query.filter(or_(User.username == username, User.email == email)).first():
         return jsonify({"message": "Username or email already exists"}), 409
 
-    hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
     new_user = User(username=username, email=email, password_hash=hashed_password)
     db.session.add(new_user)
     db.session.commit()
@@ -50,9 +53,7 @@ def logout():
 @auth_bp.route('/user/profile', methods=['GET'])
 @api_login_required
 def get_user_profile():
-    user_id = session.get('user_id')
-    user = User.query.get_or_404(user_id)
-    return jsonify(user.to_dict()), 200
+    return jsonify(g.current_user.to_dict()), 200
 
 @auth_bp.route('/user/profile', methods=['PUT'])
 @api_login_required
@@ -87,6 +88,9 @@ def update_user_profile():
 def change_password():
     user_id = session.get('user_id')
     user = User.query.get_or_404(user_id)
+    password_hash = user.password_hash
+    # End the read before the slow bcrypt checks so no write lock is held meanwhile
+    db.session.rollback()
 
     data = request.get_json()
     current_password = data.get('currentPassword')
@@ -96,16 +100,42 @@ def change_password():
     if not all([current_password, new_password, confirm_password]):
         return jsonify({"message": "All fields are required"}), 400
 
-    if not bcrypt.check_password_hash(user.password_hash, current_password):
+    if not bcrypt.check_password_hash(password_hash, current_password):
         return jsonify({"message": "Incorrect current password"}), 403
 
-    if bcrypt.check_password_hash(user.password_hash, new_password):
+    if bcrypt.check_password_hash(password_hash, new_password):
         return jsonify({"message": "New password cannot be the same as the current password"}), 400
 
     if new_password != confirm_password:
         return jsonify({"message": "New passwords do not match"}), 400
 
-    user.password_hash = bcrypt.generate_password_hash(new_password).decode('utf-8')
+    new_password_hash = bcrypt.generate_password_hash(new_password).decode('utf-8')
+    User.query.filter_by(id=user_id).update({'password_hash': new_password_hash})
     db.session.commit()
+    # Bulk updates bypass the flush hook that normally invalidates the cache
+    user_cache.invalidate(user_id)
 
     return jsonify({"message": "Password updated successfully!"}), 200
+
+@auth_bp.route('/user/addresses', methods=['GET'])
+@api_login_required
+def get_saved_addresses():
+    user_id = session.get('user_id')
+    addresses = Address.query.filter_by(user_id=user_id).order_by(Address.id.desc()).all()
+    return jsonify([address.to_dict() for address in addresses]), 200
+
+@auth_bp.route('/user/addresses', methods=['POST'])
+@api_login_required
+def save_address():
+    user_id = session.get('user_id')
+    data = request.get_json()
+
+    if not is_valid_address(data):
+        return jsonify({"message": "Full name, street address, city, postal code and country are required text fields"}), 400
+
+    address, created = OrderService.get_or_create_address(user_id, data)
+    db.session.commit()
+
+    if not created:
+        return jsonify({"message": "Address already saved", "address": address.to_dict()}), 200
+    return jsonify({"message": "Address saved successfully!", "address": address.to_dict()}), 201
@@ -5,9 +5,12 @@ from flask_session import Session
 from flask_wtf.csrf import CSRFProtect
 from flask_migrate import Migrate
 
+from .rate_limit import RateLimiter
+
 db = SQLAlchemy()
 bcrypt = Bcrypt()
 cors = CORS()
 session = Session()
 csrf = CSRFProtect()
 migrate = Migrate()
+limiter = RateLimiter()
@@ -0,0 +1,132 @@
+import threading
+import traceback
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, or_, select, update
+
+from .extensions import db
+from .models import Job
+from .sqlite import deferred_transaction
+
+# Registry of job name -> callable, filled by the @job_task decorator in app/tasks.py
+TASKS = {}
+
+def job_task(name):
+    """Registers a function as a background task that can be enqueued by name."""
+    def decorator(f):
+        TASKS[name] = f
+        return f
+    return decorator
+
+def enqueue(name, **payload):
+    """
+    Adds a job to the current session. It is committed together with the
+    caller's own changes, so a rolled-back request never leaves a job behind.
+    """
+    job = Job(
+        name=name,
+        payload=payload,
+        status='queued',
+        max_attempts=current_app.config['JOB_MAX_ATTEMPTS'],
+        run_at=datetime.utcnow()
+    )
+    db.session.add(job)
+    return job
+
+def claim_job():
+    """
+    Claims the next runnable job, or returns None. A job is runnable when it is
+    queued and due, or when a worker claimed it but its visibility timeout
+    expired without finishing it. The conditional UPDATE makes the claim safe
+    across worker threads and processes.
+    """
+    now = datetime.utcnow()
+    runnable = or_(
+        and_(Job.status == 'queued', Job.run_at <= now),
+        and_(Job.status == 'running', Job.locked_until < now)
+    )
+    # Idle polls only read, so they must not take the SQLite write lock
+    with deferred_transaction():
+        candidate_ids = db.session.scalars(select(Job.id).where(runnable).order_by(Job.run_at).limit(10)).all()
+        db.session.rollback()
+    for job_id in candidate_ids:
+        result = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, runnable)
+            .values(
+                status='running',
+                attempts=Job.attempts + 1,
+                locked_until=now + timedelta(seconds=current_app.config['JOB_VISIBILITY_TIMEOUT'])
+            )
+        )
+        db.session.commit()
+        if result.rowcount == 1:
+            # Read the claimed row without the SQLite write lock and detach it,
+            # so no transaction stays open while the task runs
+            with deferred_transaction():
+                job = db.session.get(Job, job_id)
+                db.session.expunge(job)
+                db.session.rollback()
+            return job
+    return None
+
+def _record_outcome(job_id, **values):
+    db.session.execute(update(Job).where(Job.id == job_id).values(**values))
+    db.session.commit()
+
+def run_job(job):
+    """
+    Runs a claimed (detached) job and records the outcome in a short write
+    transaction of its own, scheduling a retry with exponential backoff on failure.
+    """
+    try:
+        task = TASKS.get(job.name)
+        if task is None:
+            raise LookupError(f"No task registered under the name '{job.name}'")
+        task(**job.payload)
+        _record_outcome(job.id, status='done', locked_until=None, last_error=None)
+    except Exception:
+        db.session.rollback()
+        last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            _record_outcome(job.id, status='failed', locked_until=None, last_error=last_error)
+            current_app.logger.error("Job failed permanently", extra={'job_id': job.id, 'job_name': job.name, 'attempts': job.attempts})
+        else:
+            delay = current_app.config['JOB_RETRY_BACKOFF'] * 2 ** (job.attempts - 1)
+            _record_outcome(job.id, status='queued', locked_until=None, last_error=last_error,
+                            run_at=datetime.utcnow() + timedelta(seconds=delay))
+            current_app.logger.warning("Job failed, retrying", extra={'job_id': job.id, 'job_name': job.name, 'retry_in': delay})
+
+def _worker_loop(app, stop_event):
+    with app.app_context():
+        while not stop_event.is_set():
+            try:
+                job = claim_job()
+                if job is None:
+                    stop_event.wait(app.config['JOB_POLL_INTERVAL'])
+                    continue
+                run_job(job)
+            except Exception:
+                db.session.rollback()
+                app.logger.exception("Job worker error")
+                stop_event.wait(app.config['JOB_POLL_INTERVAL'])
+            finally:
+                db.session.remove()
+
+def run_worker(app, concurrency):
+    """Runs `concurrency` worker threads until interrupted."""
+    from . import tasks  # noqa: F401  (registers the task functions)
+
+    stop_event = threading.Event()
+    threads = [threading.Thread(target=_worker_loop, args=(app, stop_event), daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    try:
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=1)
+    except KeyboardInterrupt:
+        stop_event.set()
+        for thread in threads:
+            thread.join()
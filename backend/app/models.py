@@ -51,9 +51,9 @@ class User(db.Model):
 class Order(db.Model):
     __tablename__ = 'orders'
     id = db.Column(db.Integer, primary_key=True)
-    date = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
+    date = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp(), index=True)
     total = db.Column(db.Float, nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     address_id = db.Column(db.Integer, db.ForeignKey('addresses.id'), nullable=False)
     address = db.relationship('Address', backref=db.backref('orders', lazy='dynamic'), uselist=False)
     products = db.relationship('OrderProduct', backref='order', lazy=True)
@@ -61,6 +61,8 @@ class Order(db.Model):
 class Address(db.Model):
     __tablename__ = 'addresses'
     id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)
+    address_hash = db.Column(db.String(64), nullable=True)
     full_name = db.Column(db.String(150), nullable=False)
     street_address = db.Column(db.String(200), nullable=False)
     apartment_suite = db.Column(db.String(100), nullable=True)
@@ -69,12 +71,75 @@ class Address(db.Model):
     postal_code = db.Column(db.String(20), nullable=False)
     country = db.Column(db.String(100), nullable=False)
     phone_number = db.Column(db.String(50), nullable=True)
+    __table_args__ = (db.UniqueConstraint('user_id', 'address_hash', name='uq_addresses_user_id_address_hash'),)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'fullName': self.full_name,
+            'streetAddress': self.street_address,
+            'apartmentSuite': self.apartment_suite,
+            'city': self.city,
+            'stateProvince': self.state_province,
+            'postalCode': self.postal_code,
+            'country': self.country,
+            'phoneNumber': self.phone_number
+        }
 
 class OrderProduct(db.Model):
     __tablename__ = 'order_products'
     id = db.Column(db.Integer, primary_key=True)
     quantity = db.Column(db.Integer, nullable=False)
     unit_price = db.Column(db.Float, nullable=False)
-    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False, index=True)
     product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
     product = db.relationship('Product', backref='order_products', lazy=True)
+
+# Archive tables: cold copies of orders older than ORDER_ARCHIVE_AFTER_DAYS.
+# Rows keep their original ids so cursors and references stay valid after
+# ArchiveService moves them out of the hot tables.
+
+class ArchivedAddress(db.Model):
+    __tablename__ = 'addresses_archive'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    full_name = db.Column(db.String(150), nullable=False)
+    street_address = db.Column(db.String(200), nullable=False)
+    apartment_suite = db.Column(db.String(100), nullable=True)
+    city = db.Column(db.String(100), nullable=False)
+    state_province = db.Column(db.String(100), nullable=True)
+    postal_code = db.Column(db.String(20), nullable=False)
+    country = db.Column(db.String(100), nullable=False)
+    phone_number = db.Column(db.String(50), nullable=True)
+
+class ArchivedOrder(db.Model):
+    __tablename__ = 'orders_archive'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    date = db.Column(db.DateTime, nullable=False)
+    total = db.Column(db.Float, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    address_id = db.Column(db.Integer, db.ForeignKey('addresses_archive.id'), nullable=False)
+    address = db.relationship('ArchivedAddress', uselist=False)
+    products = db.relationship('ArchivedOrderProduct', backref='order', lazy=True)
+
+class ArchivedOrderProduct(db.Model):
+    __tablename__ = 'order_products_archive'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    unit_price = db.Column(db.Float, nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders_archive.id'), nullable=False, index=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    product = db.relationship('Product', lazy=True)
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
+    locked_until = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
+    __table_args__ = (db.Index('ix_jobs_status_run_at', 'status', 'run_at'),)
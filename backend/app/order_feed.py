@@ -0,0 +1,29 @@
+import threading
+
+class OrderFeed:
+    """
+    Wakes up admin order streams in this process as soon as an order is
+    committed. Streams also poll on a timer, which picks up orders committed
+    by other worker processes.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._version = 0
+
+    def notify(self):
+        with self._condition:
+            self._version += 1
+            self._condition.notify_all()
+
+    def wait(self, seen_version, timeout):
+        """Blocks until notify() is called after `seen_version` or `timeout` elapses; returns the current version."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._version != seen_version, timeout=timeout)
+            return self._version
+
+    @property
+    def version(self):
+        return self._version
+
+order_feed = OrderFeed()
@@ -2,9 +2,13 @@ from flask import Blueprint, jsonify, request, session, current_app
 import stripe
 
 from ..extensions import db
-from ..models import Product, Order
+from ..models import Product
 from .. import api_login_required
-from ..services.order_service import OrderService
+from ..jobs import enqueue
+from ..order_feed import order_feed
+from ..services.order_service import OrderService, is_valid_address
+from ..services.archive_service import ArchiveService
+from ..sqlite import WriteLockTimeout
 
 orders_bp = Blueprint('orders_bp', __name__)
 
@@ -53,7 +57,7 @@ def create_checkout_session():
         )
         return jsonify({'url': checkout_session.url})
     except Exception as e:
-        current_app.logger.error(f"Stripe session creation failed: {e}")
+        current_app.logger.exception("Stripe session creation failed")
         return jsonify(error=str(e)), 500
 
 @orders_bp.route('/order/verify', methods=['POST'])
@@ -62,37 +66,56 @@ def verify_order():
     data = request.get_json()
     session_id = data.get('sessionId')
     shipping_address_data = data.get('shippingAddress') # Get address from request body
+    shipping_address_id = data.get('shippingAddressId') # ...or reuse one from the address book
     user_id = session.get('user_id')
 
-    if not all([session_id, user_id, shipping_address_data]):
+    if not all([session_id, user_id]) or not (shipping_address_data or shipping_address_id):
         return jsonify({"message": "Critical information (sessionId, userId, or shippingAddress) is missing"}), 400
+    if shipping_address_id is not None and (not isinstance(shipping_address_id, int) or isinstance(shipping_address_id, bool)):
+        return jsonify({"message": "shippingAddressId must be an integer"}), 400
+    if not shipping_address_id and not is_valid_address(shipping_address_data):
+        return jsonify({"message": "Shipping address is incomplete or malformed"}), 400
 
     try:
+        # Ask Stripe first: no database transaction is open during the outbound call
         checkout_session = stripe.checkout.Session.retrieve(session_id, expand=["line_items.data.price.product"])
         if checkout_session.payment_status != "paid":
             return jsonify({"message": "Payment not successful according to Stripe"}), 402
 
-        address = OrderService.create_address(shipping_address_data)
+        if shipping_address_id:
+            address = OrderService.get_saved_address(user_id, shipping_address_id)
+            if not address:
+                return jsonify({"message": "Saved address not found"}), 404
+        else:
+            address, _ = OrderService.get_or_create_address(user_id, shipping_address_data)
         order = OrderService.create_order(user_id, checkout_session.amount_total / 100.0, address.id)
-        OrderService.update_user_phone(user_id, shipping_address_data.get('phoneNumber'))
+        if address.phone_number:
+            enqueue('update_user_phone', user_id=user_id, phone_number=address.phone_number)
         OrderService.process_line_items(order, checkout_session.line_items.data)
 
         db.session.commit()
+        order_feed.notify()
         return jsonify({"message": "Purchase verified and order saved successfully"}), 200
     except ValueError as e:
         db.session.rollback()
-        current_app.logger.error(f"Order verification failed due to value error: {e}")
+        current_app.logger.error("Order verification failed due to value error", extra={'error': str(e), 'session_id': session_id})
         return jsonify(error=str(e)), 400
+    except WriteLockTimeout:
+        # Answered with 503 by the handler in configure_sqlite
+        raise
     except Exception as e:
         db.session.rollback()
-        current_app.logger.error(f"An unexpected error occurred during order verification: {e}")
+        current_app.logger.exception("An unexpected error occurred during order verification", extra={'session_id': session_id})
         return jsonify(error="An internal error occurred. Please try again."), 500
 
 @orders_bp.route('/my-orders', methods=['GET'])
 @api_login_required
 def get_my_orders():
     user_id = session.get('user_id')
-    user_orders = Order.query.filter_by(user_id=user_id).order_by(Order.date.desc()).all()
+    limit = max(1, min(request.args.get('limit', current_app.config['ORDERS_PAGE_SIZE'], type=int),
+                       current_app.config['ORDERS_MAX_PAGE_SIZE']))
+    before = request.args.get('before', type=int)
+    user_orders, next_cursor = ArchiveService.fetch_orders(limit, before=before, user_id=user_id)
 
     orders_list = []
     for order in user_orders:
@@ -119,4 +142,7 @@ def get_my_orders():
         }
         orders_list.append(order_data)
 
-    return jsonify(orders_list), 200
+    response = jsonify(orders_list)
+    if next_cursor is not None:
+        response.headers['X-Next-Cursor'] = str(next_cursor)
+    return response, 200
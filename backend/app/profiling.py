@@ -0,0 +1,71 @@
+import cProfile
+import os
+import random
+import time
+
+from flask import current_app, g, request, session
+
+from .user_context import load_current_user
+
+def init_profiling(app):
+    """
+    Runs selected requests under cProfile and keeps the newest PROFILE_MAX_DUMPS
+    dumps in PROFILE_DIR. A request is profiled when an admin sends the
+    PROFILE_HEADER header, or at random with probability PROFILE_SAMPLE_RATE.
+    Other requests only pay for the header and sample-rate checks.
+    """
+    if not app.config['PROFILING_ENABLED']:
+        return
+    os.makedirs(app.config['PROFILE_DIR'], exist_ok=True)
+
+    @app.before_request
+    def start_profiler():
+        requested = request.headers.get(app.config['PROFILE_HEADER']) and _is_admin()
+        sample_rate = app.config['PROFILE_SAMPLE_RATE']
+        if not requested and not (sample_rate and random.random() < sample_rate):
+            return
+        g.profiler = cProfile.Profile()
+        g.profile_name = f"{time.strftime('%Y%m%dT%H%M%S')}_{g.get('request_id', 'req')}_{request.endpoint or 'unknown'}.prof"
+        g.profiler.enable()
+
+    @app.after_request
+    def add_profile_header(response):
+        if 'profile_name' in g:
+            response.headers['X-Profile-Id'] = g.profile_name
+        return response
+
+    @app.teardown_request
+    def stop_profiler(exc=None):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return
+        profiler.disable()
+        save_profile(profiler, g.pop('profile_name'))
+
+def _is_admin():
+    # Same check as admin_required: the current record, not the login-time session flag
+    if 'user_id' not in session:
+        return False
+    current_user = load_current_user()
+    return current_user is not None and current_user.is_admin
+
+def save_profile(profiler, name):
+    """Writes a dump and deletes the oldest ones beyond PROFILE_MAX_DUMPS."""
+    profile_dir = current_app.config['PROFILE_DIR']
+    try:
+        profiler.dump_stats(os.path.join(profile_dir, name))
+        dumps = sorted(list_profiles(), key=lambda dump: dump['created'])
+        for dump in dumps[:-current_app.config['PROFILE_MAX_DUMPS']]:
+            os.remove(os.path.join(profile_dir, dump['name']))
+    except OSError:
+        current_app.logger.exception("Could not save profile dump", extra={'profile': name})
+
+def list_profiles():
+    """Returns the stored dumps, newest first."""
+    profile_dir = current_app.config['PROFILE_DIR']
+    dumps = []
+    for entry in os.scandir(profile_dir):
+        if entry.is_file() and entry.name.endswith('.prof'):
+            stat = entry.stat()
+            dumps.append({'name': entry.name, 'size': stat.st_size, 'created': stat.st_mtime})
+    return sorted(dumps, key=lambda dump: dump['created'], reverse=True)
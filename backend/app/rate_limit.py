@@ -0,0 +1,164 @@
+import math
+import threading
+import time
+
+from flask import current_app, jsonify, request, session, g
+
+try:
+    import redis
+except ImportError:  # Shared storage is optional; buckets fall back to process memory.
+    redis = None
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+# Refills and consumes one token atomically inside Redis so every worker sees the same bucket.
+REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+def parse_limit(limit):
+    """Parses a limit such as '10/minute' into (capacity, tokens refilled per second)."""
+    count, period = limit.split('/')
+    return int(count), int(count) / PERIODS[period.strip()]
+
+class MemoryBucketStore:
+    """Per-process token buckets, used when no shared storage is configured or reachable."""
+    MAX_KEYS = 10000
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, rate):
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - ts) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.MAX_KEYS:
+                self._prune(now)
+        return allowed, tokens
+
+    def _prune(self, now):
+        # Buckets idle for over an hour are full again and can be recreated on demand.
+        self._buckets = {key: state for key, state in self._buckets.items() if now - state[1] < 3600}
+
+class RedisBucketStore:
+    def __init__(self, url):
+        self._client = redis.Redis.from_url(url, socket_timeout=0.05, socket_connect_timeout=0.05)
+        self._script = self._client.register_script(REDIS_TOKEN_BUCKET)
+
+    def consume(self, key, capacity, rate):
+        allowed, tokens = self._script(keys=[f'ratelimit:{key}'], args=[capacity, rate, time.time()])
+        return bool(allowed), float(tokens)
+
+class RateLimiter:
+    """
+    Token-bucket rate limiting and load shedding for the expensive blueprints.
+
+    Requests to RATELIMIT_BLUEPRINTS are checked against a per-IP bucket and,
+    for logged-in users, a per-user bucket before the view runs. Endpoints in
+    LOAD_SHED_MAX_CONCURRENT also get a per-process cap on in-flight requests.
+    Rejections are answered with 429 or 503 and a Retry-After header.
+    """
+
+    def __init__(self, app=None):
+        self._local = MemoryBucketStore()
+        self._shared = None
+        self._shared_down_until = 0
+        self._slots = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RATELIMIT_ENABLED', True)
+        app.config.setdefault('RATELIMIT_STORAGE_URL', None)
+        app.config.setdefault('RATELIMIT_STORAGE_RETRY_AFTER', 30)
+        app.config.setdefault('RATELIMIT_DEFAULT', '60/minute')
+        app.config.setdefault('RATELIMIT_BLUEPRINTS', ('auth_bp', 'orders_bp'))
+        app.config.setdefault('RATELIMIT_ROUTES', {})
+        app.config.setdefault('LOAD_SHED_MAX_CONCURRENT', {})
+        app.config.setdefault('LOAD_SHED_RETRY_AFTER', 1)
+
+        storage_url = app.config['RATELIMIT_STORAGE_URL']
+        if storage_url:
+            if redis is None:
+                app.logger.warning("RATELIMIT_STORAGE_URL is set but redis is not installed; using in-memory buckets.")
+            else:
+                self._shared = RedisBucketStore(storage_url)
+
+        self._slots = {endpoint: threading.BoundedSemaphore(limit)
+                       for endpoint, limit in app.config['LOAD_SHED_MAX_CONCURRENT'].items()}
+
+        app.before_request(self._check_request)
+        app.teardown_request(self._release_slot)
+
+    def _consume(self, key, capacity, rate):
+        # After a failure the shared store is skipped for RATELIMIT_STORAGE_RETRY_AFTER
+        # seconds, so an outage doesn't add a connect timeout to every request.
+        if self._shared is not None and time.monotonic() >= self._shared_down_until:
+            try:
+                return self._shared.consume(key, capacity, rate)
+            except redis.RedisError as e:
+                retry_after = current_app.config['RATELIMIT_STORAGE_RETRY_AFTER']
+                self._shared_down_until = time.monotonic() + retry_after
+                current_app.logger.warning("Rate limit storage unavailable, using local buckets",
+                                           extra={'error': str(e), 'retry_in': retry_after})
+        return self._local.consume(key, capacity, rate)
+
+    def _check_request(self):
+        config = current_app.config
+        if not config['RATELIMIT_ENABLED'] or request.blueprint not in config['RATELIMIT_BLUEPRINTS']:
+            return None
+        if request.method == 'OPTIONS':
+            return None
+
+        endpoint = request.endpoint
+        capacity, rate = parse_limit(config['RATELIMIT_ROUTES'].get(endpoint, config['RATELIMIT_DEFAULT']))
+        keys = [f'ip:{request.remote_addr}:{endpoint}']
+        if 'user_id' in session:
+            keys.append(f"user:{session['user_id']}:{endpoint}")
+
+        for key in keys:
+            allowed, tokens = self._consume(key, capacity, rate)
+            if not allowed:
+                retry_after = math.ceil((1 - tokens) / rate)
+                return self._reject("Too many requests. Please slow down.", 429, retry_after)
+
+        slot = self._slots.get(endpoint)
+        if slot is not None:
+            if not slot.acquire(blocking=False):
+                return self._reject("Server is busy. Please try again shortly.", 503,
+                                    config['LOAD_SHED_RETRY_AFTER'])
+            g.load_shed_slot = slot
+        return None
+
+    @staticmethod
+    def _release_slot(exc=None):
+        slot = g.pop('load_shed_slot', None)
+        if slot is not None:
+            slot.release()
+
+    @staticmethod
+    def _reject(message, status, retry_after):
+        response = jsonify({"message": message})
+        response.status_code = status
+        response.headers['Retry-After'] = str(max(1, retry_after))
+        return response
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import joinedload, selectinload
+
+from ..extensions import db
+from ..models import (Address, ArchivedAddress, ArchivedOrder, ArchivedOrderProduct,
+                      Order, OrderProduct)
+
+ADDRESS_COLUMNS = ['id', 'full_name', 'street_address', 'apartment_suite', 'city',
+                   'state_province', 'postal_code', 'country', 'phone_number']
+ORDER_COLUMNS = ['id', 'date', 'total', 'user_id', 'address_id']
+ORDER_PRODUCT_COLUMNS = ['id', 'quantity', 'unit_price', 'order_id', 'product_id']
+
+def _columns(model, names):
+    return [getattr(model, name) for name in names]
+
+class ArchiveService:
+    @staticmethod
+    def archive_orders(older_than_days, batch_size):
+        """
+        Moves orders older than `older_than_days` (with their line items and
+        addresses) into the archive tables. Each batch is copied and deleted in
+        its own transaction, so an interrupted run can simply be started again.
+        Returns the number of orders archived.
+        """
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        archived = 0
+        while True:
+            order_ids = db.session.scalars(
+                select(Order.id).where(Order.date < cutoff).order_by(Order.id).limit(batch_size)
+            ).all()
+            if not order_ids:
+                break
+
+            address_ids = db.session.scalars(
+                select(Order.address_id).where(Order.id.in_(order_ids)).distinct()
+            ).all()
+            try:
+                # An address may already be archived if an earlier batch moved another order using it.
+                db.session.execute(insert(ArchivedAddress).from_select(
+                    ADDRESS_COLUMNS,
+                    select(*_columns(Address, ADDRESS_COLUMNS)).where(
+                        Address.id.in_(address_ids),
+                        Address.id.not_in(select(ArchivedAddress.id))
+                    )
+                ))
+                db.session.execute(insert(ArchivedOrder).from_select(
+                    ORDER_COLUMNS,
+                    select(*_columns(Order, ORDER_COLUMNS)).where(Order.id.in_(order_ids))
+                ))
+                db.session.execute(insert(ArchivedOrderProduct).from_select(
+                    ORDER_PRODUCT_COLUMNS,
+                    select(*_columns(OrderProduct, ORDER_PRODUCT_COLUMNS)).where(OrderProduct.order_id.in_(order_ids))
+                ))
+
+                db.session.execute(delete(OrderProduct).where(OrderProduct.order_id.in_(order_ids)))
+                db.session.execute(delete(Order).where(Order.id.in_(order_ids)))
+                # Saved addresses and addresses still used by a hot order stay where they are.
+                db.session.execute(delete(Address).where(
+                    Address.id.in_(address_ids),
+                    Address.user_id.is_(None),
+                    Address.id.not_in(select(Order.address_id))
+                ))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            archived += len(order_ids)
+        return archived
+
+    @staticmethod
+    def fetch_orders(limit, before=None, user_id=None):
+        """
+        Returns up to `limit` orders, newest first, and the cursor for the next
+        page. The archive is only queried once the hot tables cannot fill the
+        page, i.e. when the cursor has moved past the hot window.
+        """
+        orders = ArchiveService._query_orders(Order, OrderProduct, limit, before, user_id)
+        if len(orders) < limit:
+            archive_before = orders[-1].id if orders else before
+            orders.extend(ArchiveService._query_orders(
+                ArchivedOrder, ArchivedOrderProduct, limit - len(orders), archive_before, user_id
+            ))
+        next_cursor = orders[-1].id if len(orders) == limit else None
+        return orders, next_cursor
+
+    @staticmethod
+    def fetch_new_orders(limit, since_id=None, since_date=None):
+        """
+        Returns up to `limit` orders placed after `since_id` (or after `since_date`),
+        oldest first. New orders are always in the hot tables.
+        """
+        query = Order.query.options(
+            joinedload(Order.address),
+            selectinload(Order.products).joinedload(OrderProduct.product)
+        )
+        if since_id is not None:
+            query = query.filter(Order.id > since_id)
+        if since_date is not None:
+            query = query.filter(Order.date > since_date)
+        return query.order_by(Order.id).limit(limit).all()
+
+    @staticmethod
+    def _query_orders(order_model, product_model, limit, before, user_id):
+        query = order_model.query.options(
+            joinedload(order_model.address),
+            selectinload(order_model.products).joinedload(product_model.product)
+        )
+        if user_id is not None:
+            query = query.filter(order_model.user_id == user_id)
+        if before is not None:
+            query = query.filter(order_model.id < before)
+        return query.order_by(order_model.id.desc()).limit(limit).all()
@@ -1,22 +1,76 @@
+import hashlib
+
+from sqlalchemy.exc import IntegrityError
+
 from ..extensions import db
 from ..models import Address, Order, OrderProduct, Product, User
 
+REQUIRED_ADDRESS_FIELDS = ('fullName', 'streetAddress', 'city', 'postalCode', 'country')
+OPTIONAL_ADDRESS_FIELDS = ('apartmentSuite', 'stateProvince', 'phoneNumber')
+
+def is_valid_address(address_data):
+    """Checks that required fields are non-empty strings and optional ones are strings or missing."""
+    if not isinstance(address_data, dict):
+        return False
+    if not all(isinstance(address_data.get(field), str) and address_data[field].strip()
+               for field in REQUIRED_ADDRESS_FIELDS):
+        return False
+    return all(isinstance(address_data.get(field), (str, type(None))) for field in OPTIONAL_ADDRESS_FIELDS)
+
+def _normalize(value):
+    """Collapses whitespace and case so trivially different spellings hash the same."""
+    return ' '.join((value or '').split()).casefold()
+
+def hash_address(fields):
+    """Returns a stable SHA-256 hex digest of an address given as Address column values."""
+    parts = [
+        _normalize(fields['full_name']),
+        _normalize(fields['street_address']),
+        _normalize(fields['apartment_suite']),
+        _normalize(fields['city']),
+        _normalize(fields['state_province']),
+        _normalize(fields['postal_code']).replace(' ', ''),
+        _normalize(fields['country']),
+        ''.join(ch for ch in (fields['phone_number'] or '') if ch.isdigit() or ch == '+'),
+    ]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
 class OrderService:
     @staticmethod
-    def create_address(address_data):
-        """Creates and returns a new address."""
-        address = Address(
-            full_name=address_data['fullName'],
-            street_address=address_data['streetAddress'],
-            apartment_suite=address_data.get('apartmentSuite'),
-            city=address_data['city'],
-            postal_code=address_data['postalCode'],
-            country=address_data['country'],
-            phone_number=address_data.get('phoneNumber')
-        )
-        db.session.add(address)
-        db.session.flush()
-        return address
+    def get_or_create_address(user_id, address_data):
+        """
+        Returns (address, created): the user's saved address matching `address_data`,
+        creating it if it is new. `address_data` must pass is_valid_address().
+        """
+        fields = {
+            'full_name': address_data['fullName'].strip(),
+            'street_address': address_data['streetAddress'].strip(),
+            'apartment_suite': address_data.get('apartmentSuite'),
+            'city': address_data['city'].strip(),
+            'state_province': address_data.get('stateProvince'),
+            'postal_code': address_data['postalCode'].strip(),
+            'country': address_data['country'].strip(),
+            'phone_number': address_data.get('phoneNumber')
+        }
+        address_hash = hash_address(fields)
+
+        address = Address.query.filter_by(user_id=user_id, address_hash=address_hash).first()
+        if address:
+            return address, False
+
+        address = Address(user_id=user_id, address_hash=address_hash, **fields)
+        try:
+            with db.session.begin_nested():
+                db.session.add(address)
+        except IntegrityError:
+            # Another request saved the same address in the meantime
+            return Address.query.filter_by(user_id=user_id, address_hash=address_hash).one(), False
+        return address, True
+
+    @staticmethod
+    def get_saved_address(user_id, address_id):
+        """Returns one of the user's saved addresses, or None if it does not belong to them."""
+        return Address.query.filter_by(id=address_id, user_id=user_id).first()
 
     @staticmethod
     def create_order(user_id, total, address_id):
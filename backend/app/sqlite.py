@@ -0,0 +1,116 @@
+import threading
+from contextlib import contextmanager
+
+from flask import current_app, g, has_app_context, has_request_context, jsonify, request
+from sqlalchemy import event
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# One writer at a time per process. SQLite only allows a single writer anyway;
+# queueing here hands the lock over promptly instead of relying on SQLite's
+# busy-sleep loop.
+_write_lock = threading.Lock()
+
+class WriteLockTimeout(TimeoutError):
+    """Another write transaction held the write lock for longer than busy_timeout."""
+
+def apply_sqlite_pragmas(engine, pragmas, begin_immediate=None):
+    """
+    Sets `pragmas` (e.g. {'journal_mode': 'WAL', 'busy_timeout': 5000}) on every
+    new connection of a SQLite engine and takes over transaction handling from
+    the sqlite3 driver, so BEGIN is always emitted (SAVEPOINTs need this).
+
+    When `begin_immediate()` returns True a transaction starts with
+    BEGIN IMMEDIATE under the process-wide write lock. Taking the write lock up
+    front means a transaction that reads and then writes can no longer fail
+    with 'database is locked' because another writer committed in between.
+    """
+    lock_timeout = pragmas.get('busy_timeout', 5000) / 1000
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+    @event.listens_for(engine, 'begin')
+    def do_begin(connection):
+        if begin_immediate is None or not begin_immediate():
+            connection.exec_driver_sql('BEGIN')
+            return
+        if not _write_lock.acquire(timeout=lock_timeout):
+            raise WriteLockTimeout("Timed out waiting for the SQLite write lock")
+        connection.info['holds_write_lock'] = True
+        try:
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+        except Exception:
+            _release_write_lock(connection.info)
+            raise
+
+    # The 'commit'/'rollback' connection events fire before the driver call, so
+    # the lock is released by wrapping the dialect calls instead: only once
+    # SQLite itself has let go of its write lock.
+    dialect = engine.dialect
+    dialect.do_commit = _release_after(dialect.do_commit)
+    dialect.do_rollback = _release_after(dialect.do_rollback)
+
+    @event.listens_for(engine, 'checkin')
+    def release_on_checkin(dbapi_connection, connection_record):
+        _release_write_lock(connection_record.info)
+
+def _release_after(driver_call):
+    def call(pooled_connection):
+        try:
+            driver_call(pooled_connection)
+        finally:
+            # The dialect's first-connect check passes a bare record-less proxy
+            record = pooled_connection._connection_record
+            if record is not None:
+                _release_write_lock(record.info)
+    return call
+
+def _release_write_lock(info):
+    if info.pop('holds_write_lock', False):
+        _write_lock.release()
+
+@contextmanager
+def deferred_transaction():
+    """
+    Transactions begun inside the block use a plain (deferred) BEGIN, even in
+    write requests or the worker. For reads that should not take the write
+    lock; the caller must end the transaction before writing.
+    """
+    previous = g.get('sqlite_deferred', False)
+    g.sqlite_deferred = True
+    try:
+        yield
+    finally:
+        g.sqlite_deferred = previous
+
+def _is_write_request():
+    """Write requests, CLI commands and the job worker start write transactions."""
+    if has_app_context() and g.get('sqlite_deferred'):
+        return False
+    if not has_request_context():
+        return True
+    return (request.method not in SAFE_METHODS
+            and request.endpoint not in current_app.config['SQLITE_DEFERRED_ENDPOINTS'])
+
+def configure_sqlite(app, db):
+    """Applies SQLITE_PRAGMAS and the serialized write path when the app uses SQLite."""
+    if not (app.config.get('SQLALCHEMY_DATABASE_URI') or '').startswith('sqlite'):
+        return
+    begin_immediate = _is_write_request if app.config['SQLITE_SERIALIZE_WRITES'] else None
+    with app.app_context():
+        apply_sqlite_pragmas(db.engine, app.config['SQLITE_PRAGMAS'], begin_immediate)
+
+    # Lock contention is overload, not a server error: answer like load shedding does
+    @app.errorhandler(WriteLockTimeout)
+    def write_lock_timeout(e):
+        db.session.rollback()
+        response = jsonify({"message": "Server is busy. Please try again shortly."})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(max(1, app.config.get('LOAD_SHED_RETRY_AFTER', 1)))
+        return response
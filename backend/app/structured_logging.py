@@ -0,0 +1,125 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import re
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context, request
+from flask.logging import default_handler
+
+# Attributes every LogRecord has; anything else was passed through `extra=` and is logged as a field.
+STANDARD_RECORD_ATTRS = set(logging.makeLogRecord({}).__dict__) | {'message', 'asctime', 'request_id'}
+VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+        }
+        for key, value in record.__dict__.items():
+            if key not in STANDARD_RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class RequestContextFilter(logging.Filter):
+    """Stamps records with the current request id and samples INFO/DEBUG records."""
+
+    def __init__(self, sample_rate):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record):
+        if record.levelno <= logging.INFO and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return False
+        record.request_id = g.get('request_id') if has_request_context() else None
+        return True
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the background writer. It never blocks the request thread:
+    when the queue is full the record is dropped and counted.
+    """
+
+    def __init__(self, log_queue, listener=None):
+        super().__init__(log_queue)
+        self.listener = listener
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Render the message and traceback now, while the arguments are still
+        # in scope, but leave the JSON formatting to the writer thread.
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def configure_logging(app):
+    """
+    Routes app.logger through a bounded queue to a background thread that writes
+    JSON lines to LOG_FILE (or stderr), and tags every request with an id that
+    is echoed back in the REQUEST_ID_HEADER response header.
+    """
+    # app.logger is shared by every app with the same name (e.g. one per test):
+    # replace the handler and writer thread a previous create_app() installed.
+    for handler in list(app.logger.handlers):
+        if isinstance(handler, NonBlockingQueueHandler):
+            app.logger.removeHandler(handler)
+            atexit.unregister(handler.listener.stop)
+            handler.listener.stop()
+
+    log_queue = queue.Queue(maxsize=app.config['LOG_QUEUE_SIZE'])
+    target = logging.FileHandler(app.config['LOG_FILE']) if app.config['LOG_FILE'] else logging.StreamHandler()
+    target.setFormatter(JsonFormatter())
+    listener = QueueListener(log_queue, target, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    queue_handler = NonBlockingQueueHandler(log_queue, listener)
+    queue_handler.addFilter(RequestContextFilter(app.config['LOG_INFO_SAMPLE_RATE']))
+
+    app.logger.removeHandler(default_handler)
+    app.logger.addHandler(queue_handler)
+    app.logger.setLevel(app.config['LOG_LEVEL'])
+    app.extensions['log_listener'] = listener
+
+    header = app.config['REQUEST_ID_HEADER']
+
+    @app.before_request
+    def assign_request_id():
+        incoming = request.headers.get(header, '')
+        g.request_id = incoming if VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def log_request(response):
+        response.headers[header] = g.get('request_id', '')
+        if 'request_started' in g:
+            app.logger.info("request", extra={
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': round((time.perf_counter() - g.request_started) * 1000, 2),
+            })
+        return response
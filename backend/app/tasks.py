@@ -0,0 +1,22 @@
+import os
+from flask import current_app
+
+from .extensions import db
+from .jobs import job_task
+from .services.order_service import OrderService
+
+@job_task('delete_product_images')
+def delete_product_images(filenames):
+    """Removes the image files of a deleted product from the upload folder."""
+    for filename in filenames:
+        try:
+            os.remove(os.path.join(current_app.config['UPLOAD_FOLDER'], filename))
+        except FileNotFoundError:
+            # Already gone, e.g. a retry after a partial run
+            continue
+
+@job_task('update_user_phone')
+def update_user_phone(user_id, phone_number):
+    """Stores the phone number from an order's shipping address on the user's profile."""
+    OrderService.update_user_phone(user_id, phone_number)
+    db.session.commit()
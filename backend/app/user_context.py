@@ -0,0 +1,93 @@
+import threading
+import time
+
+from flask import current_app, g, session
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from .extensions import db
+from .models import User
+from .sqlite import deferred_transaction
+
+class CurrentUser:
+    """Detached, read-only snapshot of the logged-in user, safe to share between requests."""
+    __slots__ = ('id', 'username', 'email', 'is_admin', 'phone_number')
+
+    def __init__(self, user):
+        self.id = user.id
+        self.username = user.username
+        self.email = user.email
+        self.is_admin = user.is_admin
+        self.phone_number = user.phone_number
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "username": self.username,
+            "email": self.email,
+            "is_admin": self.is_admin,
+            "phoneNumber": self.phone_number
+        }
+
+class UserCache:
+    """Per-process cache of CurrentUser snapshots, expiring after USER_CACHE_TTL seconds."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, user_id, current_user, ttl):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + ttl, current_user)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+user_cache = UserCache()
+
+def load_current_user():
+    """
+    Returns the CurrentUser for the session's user_id, or None if the user no
+    longer exists. Looked up at most once per request and cached across
+    requests for USER_CACHE_TTL seconds.
+    """
+    if 'current_user' in g:
+        return g.current_user
+
+    user_id = session.get('user_id')
+    current_user = user_cache.get(user_id)
+    if current_user is None:
+        # Read on a short-lived connection of its own, so the request's session
+        # never has a transaction (or, for writes, the SQLite write lock) open
+        # before the view runs.
+        with deferred_transaction(), db.engine.connect() as connection:
+            user = connection.execute(select(User.__table__).where(User.id == user_id)).first()
+        if user is not None:
+            current_user = CurrentUser(user)
+            user_cache.set(user_id, current_user, current_app.config['USER_CACHE_TTL'])
+    g.current_user = current_user
+    return current_user
+
+# Any committed change to a User row drops its cached snapshot, so profile,
+# password and admin-flag changes are seen on the next request.
+@event.listens_for(Session, 'after_flush')
+def collect_changed_users(session, flush_context):
+    changed = {obj.id for obj in list(session.dirty) + list(session.deleted) if isinstance(obj, User)}
+    if changed:
+        session.info.setdefault('changed_user_ids', set()).update(changed)
+
+@event.listens_for(Session, 'after_commit')
+def invalidate_changed_users(session):
+    for user_id in session.info.pop('changed_user_ids', ()):
+        user_cache.invalidate(user_id)
+
+@event.listens_for(Session, 'after_rollback')
+def forget_changed_users(session):
+    session.info.pop('changed_user_ids', None)
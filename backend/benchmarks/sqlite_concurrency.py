@@ -0,0 +1,96 @@
+"""
+Measures read latency on SQLite while another process keeps writing, with the
+driver defaults and with the SQLITE_PRAGMAS from config.py.
+
+    python benchmarks/sqlite_concurrency.py [--seconds 5] [--readers 4]
+
+With the default rollback journal, readers fail with 'database is locked' or
+stall while a write commits; in WAL mode they read the last committed snapshot
+and are not blocked by the writer.
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import Config  # noqa: E402
+from app.sqlite import apply_sqlite_pragmas  # noqa: E402
+
+def make_engine(path, pragmas):
+    engine = create_engine(f'sqlite:///{path}')
+    if pragmas is not None:
+        apply_sqlite_pragmas(engine, pragmas)
+    return engine
+
+def writer(path, pragmas, stop_at, results):
+    engine = make_engine(path, pragmas)
+    writes = errors = 0
+    payload = 'x' * 2000
+    while time.time() < stop_at:
+        try:
+            with engine.begin() as conn:
+                for _ in range(200):
+                    conn.execute(text("INSERT INTO items (payload) VALUES (:payload)"), {'payload': payload})
+            writes += 1
+        except OperationalError:
+            errors += 1
+    results.put(('writer', writes, errors, []))
+
+def reader(path, pragmas, stop_at, results):
+    engine = make_engine(path, pragmas)
+    latencies = []
+    errors = 0
+    while time.time() < stop_at:
+        started = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT COUNT(*) FROM items WHERE id % 7 = 0")).scalar()
+            latencies.append((time.perf_counter() - started) * 1000)
+        except OperationalError:
+            errors += 1
+    results.put(('reader', len(latencies), errors, latencies))
+
+def run(label, pragmas, seconds, readers):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        engine = make_engine(path, pragmas)
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, payload TEXT)"))
+        engine.dispose()
+
+        results = multiprocessing.Queue()
+        stop_at = time.time() + seconds
+        processes = [multiprocessing.Process(target=writer, args=(path, pragmas, stop_at, results))]
+        processes += [multiprocessing.Process(target=reader, args=(path, pragmas, stop_at, results))
+                      for _ in range(readers)]
+        for process in processes:
+            process.start()
+        outcomes = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+    write_txns = sum(o[1] for o in outcomes if o[0] == 'writer')
+    write_errors = sum(o[2] for o in outcomes if o[0] == 'writer')
+    reads = sum(o[1] for o in outcomes if o[0] == 'reader')
+    read_errors = sum(o[2] for o in outcomes if o[0] == 'reader')
+    latencies = sorted(latency for o in outcomes if o[0] == 'reader' for latency in o[3])
+    p50 = statistics.median(latencies) if latencies else float('nan')
+    p99 = latencies[int(len(latencies) * 0.99)] if latencies else float('nan')
+    print(f"{label:<10} writes={write_txns:<6} write_errors={write_errors:<5} reads={reads:<8} "
+          f"read_errors={read_errors:<6} p50={p50:.2f}ms p99={p99:.2f}ms max={max(latencies or [0]):.2f}ms")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--readers', type=int, default=4)
+    args = parser.parse_args()
+
+    run('default', None, args.seconds, args.readers)
+    run('wal', Config.SQLITE_PRAGMAS, args.seconds, args.readers)
@@ -24,9 +24,94 @@ class Config:
     # Configuración de Stripe
     STRIPE_API_KEY = os.environ.get('STRIPE_API_KEY')
 
+    # Segundos que se reutilizan los datos del usuario autenticado entre peticiones
+    USER_CACHE_TTL = 30
+
     # Configuración de CORS
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:5173')
 
+    # Logging estructurado (JSON) escrito por un hilo en segundo plano
+    LOG_FILE = os.environ.get('LOG_FILE')  # sin valor se escribe a stderr
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_INFO_SAMPLE_RATE = float(os.environ.get('LOG_INFO_SAMPLE_RATE', 1.0))  # fracción de logs INFO/DEBUG que se conservan
+    LOG_QUEUE_SIZE = 10000
+    REQUEST_ID_HEADER = 'X-Request-ID'
+
+    # Perfilado bajo demanda: un admin envía la cabecera PROFILE_HEADER, o se
+    # perfila una fracción PROFILE_SAMPLE_RATE de las peticiones al azar
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'true').lower() == 'true'
+    PROFILE_HEADER = 'X-Profile'
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0.0))
+    PROFILE_DIR = os.environ.get('PROFILE_DIR') or os.path.join(os.path.abspath(os.path.dirname(__file__)), 'profiles')
+    PROFILE_MAX_DUMPS = 50
+
+    # Modo SQLite para despliegues con varios workers: se aplica a cada conexión
+    # cuando SQLALCHEMY_DATABASE_URI apunta a SQLite
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',  # las lecturas no esperan a las escrituras
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,  # ms
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64000,  # en KiB (64 MB)
+    }
+    # Las peticiones POST/PUT/DELETE abren su transacción con BEGIN IMMEDIATE,
+    # salvo estos endpoints, que solo leen (o llaman a servicios externos)
+    SQLITE_SERIALIZE_WRITES = True
+    SQLITE_DEFERRED_ENDPOINTS = (
+        'auth_bp.login',
+        'auth_bp.logout',
+        'orders_bp.create_checkout_session',
+        'api_bp.get_products_batch',
+    )
+
+    # Archivado de pedidos y paginación de historiales
+    ORDER_ARCHIVE_AFTER_DAYS = int(os.environ.get('ORDER_ARCHIVE_AFTER_DAYS', 365))
+    ORDER_ARCHIVE_BATCH_SIZE = int(os.environ.get('ORDER_ARCHIVE_BATCH_SIZE', 500))
+    ORDERS_PAGE_SIZE = 50
+    ORDERS_MAX_PAGE_SIZE = 200
+    # Feed de pedidos nuevos para el panel de administración. Por defecto el
+    # frontend consulta /api/admin/orders?since=; el stream SSE ocupa un hilo
+    # por pestaña abierta, así que solo debe activarse con workers con hilos
+    # (ver gunicorn.conf.py)
+    ORDER_FEED_SSE_ENABLED = os.environ.get('ORDER_FEED_SSE_ENABLED', 'false').lower() == 'true'
+    ORDER_FEED_POLL_INTERVAL = 5  # segundos; detecta pedidos de otros workers
+    ORDER_FEED_MAX_STREAM_SECONDS = 300  # el navegador se reconecta solo al cerrarse
+
+    # Máximo de productos por petición en /api/products?ids= y /api/products/batch
+    PRODUCTS_BATCH_MAX_IDS = 200
+
+    # Limitación de peticiones (token bucket) para auth_bp y orders_bp.
+    # Con RATELIMIT_STORAGE_URL (p. ej. redis://localhost:6379/0) los buckets se
+    # comparten entre workers; sin ella se guardan en memoria de cada proceso.
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    RATELIMIT_STORAGE_URL = os.environ.get('RATELIMIT_STORAGE_URL')
+    RATELIMIT_STORAGE_RETRY_AFTER = 30  # segundos sin usar Redis tras un fallo de conexión
+    RATELIMIT_DEFAULT = '60/minute'
+    RATELIMIT_BLUEPRINTS = ('auth_bp', 'orders_bp')
+    RATELIMIT_ROUTES = {
+        'auth_bp.login': '10/minute',
+        'auth_bp.register': '5/minute',
+        'auth_bp.change_password': '5/minute',
+        'orders_bp.create_checkout_session': '10/minute',
+        'orders_bp.verify_order': '10/minute',
+    }
+    # Máximo de peticiones simultáneas por proceso antes de responder 503
+    LOAD_SHED_MAX_CONCURRENT = {
+        'auth_bp.login': 4,
+        'auth_bp.register': 4,
+        'auth_bp.change_password': 4,
+        'orders_bp.create_checkout_session': 8,
+        'orders_bp.verify_order': 8,
+    }
+    LOAD_SHED_RETRY_AFTER = 2
+
+    # Cola de trabajos en segundo plano (se procesa con `flask worker`)
+    JOB_QUEUE_CONCURRENCY = int(os.environ.get('JOB_QUEUE_CONCURRENCY', 2))
+    JOB_POLL_INTERVAL = 1.0  # segundos entre consultas cuando la cola está vacía
+    JOB_VISIBILITY_TIMEOUT = 300  # segundos antes de que otro worker retome un trabajo sin terminar
+    JOB_MAX_ATTEMPTS = 5
+    JOB_RETRY_BACKOFF = 10  # segundos; se duplica en cada reintento
+
 
 class DevelopmentConfig(Config):
     """Configuración para desarrollo."""
@@ -0,0 +1,9 @@
+# Configuración de Gunicorn para producción (se carga con `gunicorn -c gunicorn.conf.py`)
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 2))
+# Workers con hilos: una petición lenta (o un stream SSE del panel de
+# administración, si ORDER_FEED_SSE_ENABLED) ocupa un hilo, no el worker entero
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
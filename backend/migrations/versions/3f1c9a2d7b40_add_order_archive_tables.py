@@ -0,0 +1,82 @@
+"""Add order archive tables and hot order indexes
+
+Revision ID: 3f1c9a2d7b40
+Revises: 6b9052109516
+Create Date: 2026-10-19 10:12:41.208533
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c9a2d7b40'
+down_revision = '6b9052109516'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('addresses_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('full_name', sa.String(length=150), nullable=False),
+    sa.Column('street_address', sa.String(length=200), nullable=False),
+    sa.Column('apartment_suite', sa.String(length=100), nullable=True),
+    sa.Column('city', sa.String(length=100), nullable=False),
+    sa.Column('state_province', sa.String(length=100), nullable=True),
+    sa.Column('postal_code', sa.String(length=20), nullable=False),
+    sa.Column('country', sa.String(length=100), nullable=False),
+    sa.Column('phone_number', sa.String(length=50), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('orders_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('date', sa.DateTime(), nullable=False),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('address_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['address_id'], ['addresses_archive.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('orders_archive', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_orders_archive_user_id'), ['user_id'], unique=False)
+
+    op.create_table('order_products_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('unit_price', sa.Float(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['order_id'], ['orders_archive.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('order_products_archive', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_products_archive_order_id'), ['order_id'], unique=False)
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_orders_date'), ['date'], unique=False)
+        batch_op.create_index(batch_op.f('ix_orders_user_id'), ['user_id'], unique=False)
+
+    with op.batch_alter_table('order_products', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_products_order_id'), ['order_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('order_products', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_order_products_order_id'))
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_orders_user_id'))
+        batch_op.drop_index(batch_op.f('ix_orders_date'))
+
+    with op.batch_alter_table('order_products_archive', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_order_products_archive_order_id'))
+
+    op.drop_table('order_products_archive')
+    with op.batch_alter_table('orders_archive', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_orders_archive_user_id'))
+
+    op.drop_table('orders_archive')
+    op.drop_table('addresses_archive')
@@ -0,0 +1,83 @@
+"""Deduplicate addresses into a per-user address book
+
+Revision ID: b7a5c3e9d214
+Revises: 8d2e4b6f1a93
+Create Date: 2026-10-19 11:48:52.907316
+
+"""
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7a5c3e9d214'
+down_revision = '8d2e4b6f1a93'
+branch_labels = None
+depends_on = None
+
+
+# Frozen copy of app.services.order_service.hash_address so this migration
+# keeps producing the same hashes even if the application code changes.
+def _normalize(value):
+    return ' '.join((value or '').split()).casefold()
+
+def _hash_address(row):
+    parts = [
+        _normalize(row.full_name),
+        _normalize(row.street_address),
+        _normalize(row.apartment_suite),
+        _normalize(row.city),
+        _normalize(row.state_province),
+        _normalize(row.postal_code).replace(' ', ''),
+        _normalize(row.country),
+        ''.join(ch for ch in (row.phone_number or '') if ch.isdigit() or ch == '+'),
+    ]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def upgrade():
+    with op.batch_alter_table('addresses', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('user_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('address_hash', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_addresses_user_id'), ['user_id'], unique=False)
+        batch_op.create_foreign_key('fk_addresses_user_id_users', 'users', ['user_id'], ['id'])
+
+    # Assign each address to the customer of the order that uses it, hash it,
+    # and merge addresses that are duplicates for the same customer.
+    conn = op.get_bind()
+    rows = conn.execute(sa.text(
+        "SELECT a.id, a.full_name, a.street_address, a.apartment_suite, a.city, a.state_province, "
+        "a.postal_code, a.country, a.phone_number, MIN(o.user_id) AS user_id "
+        "FROM addresses a JOIN orders o ON o.address_id = a.id "
+        "GROUP BY a.id, a.full_name, a.street_address, a.apartment_suite, a.city, a.state_province, "
+        "a.postal_code, a.country, a.phone_number "
+        "ORDER BY a.id"
+    )).fetchall()
+
+    keepers = {}
+    for row in rows:
+        key = (row.user_id, _hash_address(row))
+        keeper_id = keepers.get(key)
+        if keeper_id is None:
+            keepers[key] = row.id
+            conn.execute(sa.text("UPDATE addresses SET user_id = :user_id, address_hash = :address_hash WHERE id = :id"),
+                         {'user_id': key[0], 'address_hash': key[1], 'id': row.id})
+        else:
+            conn.execute(sa.text("UPDATE orders SET address_id = :keeper_id WHERE address_id = :id"),
+                         {'keeper_id': keeper_id, 'id': row.id})
+            conn.execute(sa.text("DELETE FROM addresses WHERE id = :id"), {'id': row.id})
+
+    with op.batch_alter_table('addresses', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_addresses_user_id_address_hash', ['user_id', 'address_hash'])
+
+
+def downgrade():
+    # Merged duplicates are not split again; orders keep pointing at the surviving address.
+    with op.batch_alter_table('addresses', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_addresses_user_id_address_hash', type_='unique')
+        batch_op.drop_constraint('fk_addresses_user_id_users', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_addresses_user_id'))
+        batch_op.drop_column('address_hash')
+        batch_op.drop_column('user_id')
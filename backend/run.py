@@ -3,6 +3,8 @@ import click
 from app import create_app, db
 from app.models import User, Product, Order
 from app.extensions import bcrypt
+from app.services.archive_service import ArchiveService
+from app.jobs import run_worker
 
 # Create the Flask app instance
 app = create_app(os.getenv('FLASK_CONFIG') or 'default')
@@ -30,6 +32,24 @@ def create_admin(password):
     db.session.commit()
     print('Admin user "admin" created successfully.')
 
+@app.cli.command('archive-orders')
+@click.option('--days', type=int, default=None, help='Archive orders older than this many days.')
+@click.option('--batch-size', type=int, default=None, help='Orders moved per transaction.')
+def archive_orders(days, batch_size):
+    """Moves old orders, their items and addresses into the archive tables."""
+    days = days if days is not None else app.config['ORDER_ARCHIVE_AFTER_DAYS']
+    batch_size = batch_size or app.config['ORDER_ARCHIVE_BATCH_SIZE']
+    archived = ArchiveService.archive_orders(days, batch_size)
+    print(f'Archived {archived} orders older than {days} days.')
+
+@app.cli.command('worker')
+@click.option('--concurrency', type=int, default=None, help='Number of worker threads.')
+def worker(concurrency):
+    """Processes background jobs from the database queue."""
+    concurrency = concurrency or app.config['JOB_QUEUE_CONCURRENCY']
+    print(f'Starting job worker with {concurrency} threads.')
+    run_worker(app, concurrency)
+
 if __name__ == '__main__':
     # The application is run through the 'flask run' command,
     # which is configured by environment variables.
@@ -6,6 +6,7 @@
 import { createContext, useState, useContext, useMemo, useEffect, useCallback } from 'react';
 import { useAuth } from './AuthContext.jsx';
 import { toast } from 'react-toastify';
+import axiosInstance from '../api/axiosInstance.js';
 
 // 1. Create the context object. This is what components will consume.
 const CartContext = createContext(null);
@@ -35,6 +36,43 @@ export function CartProvider({ children }) {
     localStorage.setItem('cartItems', JSON.stringify(cartItems));
   }, [cartItems]);
 
+  // EFFECT 1b: Refresh price, stock and images of the stored items with a single
+  // batch request when the app loads. Products that no longer exist or are out
+  // of stock are dropped, and quantities are capped at the current stock.
+  useEffect(() => {
+    const ids = cartItems.map(item => item.id);
+    if (ids.length === 0) return;
+
+    const rehydrateCart = async () => {
+      try {
+        const response = await axiosInstance.post('/api/products/batch', { ids });
+        const freshProducts = new Map(response.data.products.map(product => [product.id, product]));
+        setCartItems(prevItems => prevItems
+          .filter(item => freshProducts.has(item.id) && freshProducts.get(item.id).stock > 0)
+          .map(item => {
+            const product = freshProducts.get(item.id);
+            return { ...product, quantity: Math.min(item.quantity, product.stock) };
+          }));
+        if (response.data.missing.length > 0) {
+          toast.info("Some items in your cart are no longer available and were removed.");
+        }
+        cartItems.forEach(item => {
+          const product = freshProducts.get(item.id);
+          if (!product) return;
+          if (product.stock < 1) {
+            toast.warn(`"${product.name}" is out of stock and was removed from the cart.`);
+          } else if (item.quantity > product.stock) {
+            toast.warn(`Only ${product.stock} of "${product.name}" in stock.`);
+          }
+        });
+      } catch (error) {
+        console.error("Failed to refresh cart items", error.response || error);
+      }
+    };
+    rehydrateCart();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, []); // Only on first load; later changes come from the user's own actions.
+
   // EFFECT 2: This effect listens for changes in the user's authentication state.
   // It runs every time the 'user' object changes.
   useEffect(() => {
@@ -6,9 +6,14 @@ import { toast } from 'react-toastify';
 import styles from './ManageOrdersPage.module.css'; // Crearemos este archivo
 import '../App.css';
 
+const ORDER_POLL_INTERVAL_MS = 15000;
+const USE_ORDER_STREAM = import.meta.env.VITE_ORDER_FEED_SSE === 'true';
+
 function ManageOrdersPage() {
   const [orders, setOrders] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     const fetchOrders = async () => {
@@ -16,6 +21,7 @@ function ManageOrdersPage() {
         setLoading(true);
         const response = await axiosInstance.get('/api/admin/orders');
         setOrders(response.data);
+        setNextCursor(response.headers['x-next-cursor'] || null);
       } catch (error) {
         console.error("Error fetching ALL orders:", error.response || error);
         toast.error("Failed to load orders.");
@@ -26,6 +32,68 @@ function ManageOrdersPage() {
     fetchOrders();
   }, []);
 
+  // New orders are fetched incrementally with ?since=, so the list never has
+  // to be refetched in full. The server-sent events stream is only used when
+  // the backend enables it (ORDER_FEED_SSE_ENABLED) and VITE_ORDER_FEED_SSE is set.
+  useEffect(() => {
+    if (loading) return;
+    const addNewOrders = (newOrders) => {
+      setOrders(prevOrders => {
+        const fresh = newOrders.filter(newOrder => !prevOrders.some(order => order.id === newOrder.id));
+        return [...fresh.reverse(), ...prevOrders];
+      });
+    };
+    let latestId = orders.length > 0 ? orders[0].id : 0;
+
+    if (USE_ORDER_STREAM) {
+      const source = new EventSource(
+        `${axiosInstance.defaults.baseURL}/api/admin/orders/stream?since=${latestId}`,
+        { withCredentials: true }
+      );
+      source.addEventListener('order', (event) => addNewOrders([JSON.parse(event.data)]));
+      return () => source.close();
+    }
+
+    let timeoutId;
+    let stopped = false;
+    const pollNewOrders = async () => {
+      try {
+        let response;
+        do {
+          response = await axiosInstance.get('/api/admin/orders', { params: { since: latestId } });
+          if (response.data.length > 0) {
+            latestId = response.data[response.data.length - 1].id;
+            addNewOrders(response.data);
+          }
+        } while (!stopped && response.headers['x-next-cursor']);
+      } catch (error) {
+        console.error("Error polling new orders:", error.response || error);
+      }
+      if (!stopped) timeoutId = setTimeout(pollNewOrders, ORDER_POLL_INTERVAL_MS);
+    };
+    timeoutId = setTimeout(pollNewOrders, ORDER_POLL_INTERVAL_MS);
+    return () => {
+      stopped = true;
+      clearTimeout(timeoutId);
+    };
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [loading]); // Start once the first page is loaded
+
+  // Older orders (including archived ones) are fetched page by page
+  const loadMoreOrders = async () => {
+    try {
+      setLoadingMore(true);
+      const response = await axiosInstance.get('/api/admin/orders', { params: { before: nextCursor } });
+      setOrders(prevOrders => [...prevOrders, ...response.data]);
+      setNextCursor(response.headers['x-next-cursor'] || null);
+    } catch (error) {
+      console.error("Error fetching older orders:", error.response || error);
+      toast.error("Failed to load older orders.");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   if (loading) {
     return <main className="container"><p>Loading orders...</p></main>;
   }
@@ -73,6 +141,11 @@ function ManageOrdersPage() {
               </div>
             </div>
           ))}
+          {nextCursor && (
+            <button onClick={loadMoreOrders} disabled={loadingMore}>
+              {loadingMore ? 'Loading...' : 'Load older orders'}
+            </button>
+          )}
         </div>
       )}
     </main>
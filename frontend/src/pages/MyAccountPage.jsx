@@ -11,6 +11,8 @@ function MyAccountPage() {
   const { user, updateUser } = useAuth();
   const [orders, setOrders] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [isEditing, setIsEditing] = useState(false);
   const [profileData, setProfileData] = useState({ username: '', email: '', phoneNumber: '' });
   const [saving, setSaving] = useState(false);
@@ -25,6 +27,7 @@ function MyAccountPage() {
         setLoading(true);
         const response = await axiosInstance.get('/api/my-orders');
         setOrders(response.data);
+        setNextCursor(response.headers['x-next-cursor'] || null);
       } catch (error) {
         console.error("Error fetching orders:", error.response || error);
         toast.error("Could not load order history.");
@@ -39,6 +42,21 @@ function MyAccountPage() {
     }
   }, [user]); // Se ejecuta cuando el estado 'user' cambia
 
+  // Pedidos más antiguos (incluidos los archivados) se cargan por páginas
+  const loadMoreOrders = async () => {
+    try {
+      setLoadingMore(true);
+      const response = await axiosInstance.get('/api/my-orders', { params: { before: nextCursor } });
+      setOrders(prevOrders => [...prevOrders, ...response.data]);
+      setNextCursor(response.headers['x-next-cursor'] || null);
+    } catch (error) {
+      console.error("Error fetching older orders:", error.response || error);
+      toast.error("Could not load older orders.");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
 // Rellenamos el formulario con los datos del usuario del contexto
   useEffect(() => {
     if (user) {
@@ -260,6 +278,11 @@ return (
                 </div>
               </div>
             ))}
+            {nextCursor && (
+              <button onClick={loadMoreOrders} disabled={loadingMore}>
+                {loadingMore ? 'Loading...' : 'Load older orders'}
+              </button>
+            )}
           </div>
         )}
       </div>